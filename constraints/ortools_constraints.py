@@ -23,14 +23,21 @@ class VariableManager:
             self.step_variables.clear()
             self.user_step_variables.clear()
             
+            n_steps = self.instance.number_of_steps
+            n_users = self.instance.number_of_users
+            matrix = self.instance.user_step_matrix
+            new_bool_var = self.model.NewBoolVar
+            step_variables = self.step_variables
+            user_step_variables = self.user_step_variables
+
             # Create variables only for authorized user-step pairs
-            for step in range(self.instance.number_of_steps):
-                self.step_variables[step] = []
-                for user in range(self.instance.number_of_users):
-                    if self.instance.user_step_matrix[user][step]:
-                        var = self.model.NewBoolVar(f's{step + 1}_u{user + 1}')
-                        self.step_variables[step].append((user, var))
-                        self.user_step_variables[user][step] = var
+            for step in range(n_steps):
+                step_vars = step_variables[step] = []
+                for user in range(n_users):
+                    if matrix[user][step]:
+                        var = new_bool_var(f's{step + 1}_u{user + 1}')
+                        step_vars.append((user, var))
+                        user_step_variables[user][step] = var
                         
             self._initialized = True
             return True
@@ -56,13 +63,15 @@ class VariableManager:
         
     def get_authorized_users(self, step: int) -> Set[int]:
         """Get set of users authorized for a step"""
+        matrix = self.instance.user_step_matrix
         return {user for user in range(self.instance.number_of_users)
-                if self.instance.user_step_matrix[user][step]}
+                if matrix[user][step]}
                 
     def get_authorized_steps(self, user: int) -> Set[int]:
         """Get set of steps a user is authorized for"""
+        user_row = self.instance.user_step_matrix[user]
         return {step for step in range(self.instance.number_of_steps)
-                if self.instance.user_step_matrix[user][step]}
+                if user_row[step]}
                 
     def has_variable(self, user: int, step: int) -> bool:
         """Check if variable exists for user-step pair"""
@@ -81,8 +90,9 @@ class VariableManager:
         self._check_initialized()
         
         assignment = {}
+        step_variables = self.step_variables
         for step in range(self.instance.number_of_steps):
-            for user, var in self.step_variables[step]:
+            for user, var in step_variables[step]:
                 if solver.Value(var):
                     assignment[step + 1] = user + 1
                     break
@@ -125,9 +135,10 @@ class AuthorizationConstraint(BaseConstraint):
     """Ensures each step is assigned to exactly one authorized user"""
     def check_feasibility(self) -> Tuple[bool, List[str]]:
         infeasible_steps = []
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for step in range(self.instance.number_of_steps):
-            if not any(self.instance.user_step_matrix[user][step] 
-                      for user in range(self.instance.number_of_users)):
+            if not any(matrix[user][step] for user in range(n_users)):
                 infeasible_steps.append(step + 1)
                 
         return (len(infeasible_steps) == 0, 
@@ -158,25 +169,28 @@ class BindingOfDutyConstraint(BaseConstraint):
 
     def _get_common_users(self, s1: int, s2: int) -> Set[int]:
         """Get users authorized for both steps"""
+        matrix = self.instance.user_step_matrix
         return {user for user in range(self.instance.number_of_users)
-                if (self.instance.user_step_matrix[user][s1] and 
-                    self.instance.user_step_matrix[user][s2])}
+                if matrix[user][s1] and matrix[user][s2]}
 
     def add_to_model(self) -> bool:
         is_feasible, errors = self.check_feasibility()
         if not is_feasible:
             return False
             
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
+        user_step_variables = self.var_manager.user_step_variables
+        add = self.model.Add
         for s1, s2 in self.instance.BOD:
             s1_vars = []
             s2_vars = []
             
-            for user in range(self.instance.number_of_users):
-                if (self.instance.user_step_matrix[user][s1] and 
-                    self.instance.user_step_matrix[user][s2]):
-                    var1 = self.var_manager.user_step_variables[user][s1]
-                    var2 = self.var_manager.user_step_variables[user][s2]
-                    self.model.Add(var1 == var2)
+            for user in range(n_users):
+                if matrix[user][s1] and matrix[user][s2]:
+                    var1 = user_step_variables[user][s1]
+                    var2 = user_step_variables[user][s2]
+                    add(var1 == var2)
                     s1_vars.append(var1)
                     s2_vars.append(var2)
             
@@ -194,13 +208,14 @@ class SeparationOfDutyConstraint(BaseConstraint):
         return True, []
 
     def add_to_model(self) -> bool:
+        n_users = self.instance.number_of_users
+        user_step_variables = self.var_manager.user_step_variables
+        add = self.model.Add
         for s1, s2 in self.instance.SOD:
-            for user in range(self.instance.number_of_users):
-                if (s1 in self.var_manager.user_step_variables[user] and 
-                    s2 in self.var_manager.user_step_variables[user]):
-                    var1 = self.var_manager.user_step_variables[user][s1]
-                    var2 = self.var_manager.user_step_variables[user][s2]
-                    self.model.Add(var1 + var2 <= 1)
+            for user in range(n_users):
+                user_vars = user_step_variables[user]
+                if s1 in user_vars and s2 in user_vars:
+                    add(user_vars[s1] + user_vars[s2] <= 1)
         return True
 
 
@@ -208,9 +223,11 @@ class AtMostKConstraint(BaseConstraint):
     """Ensures users are not assigned more than k steps from specified groups"""
     def check_feasibility(self) -> Tuple[bool, List[str]]:
         infeasible = []
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for k, steps in self.instance.at_most_k:
-            total_users = len(set(u for u in range(self.instance.number_of_users)
-                                for s in steps if self.instance.user_step_matrix[u][s]))
+            total_users = len(set(u for u in range(n_users)
+                                for s in steps if matrix[u][s]))
             min_users_needed = len(steps) / k
             if total_users < min_users_needed:
                 infeasible.append((k, steps, total_users, min_users_needed))
@@ -225,28 +242,26 @@ class AtMostKConstraint(BaseConstraint):
         if not is_feasible:
             return False
             
+        n_users = self.instance.number_of_users
+        user_step_variables = self.var_manager.user_step_variables
+        add = self.model.Add
         for k, steps in self.instance.at_most_k:
-            for user in range(self.instance.number_of_users):
-                user_step_vars = []
-                for step in steps:
-                    if step in self.var_manager.user_step_variables[user]:
-                        user_step_vars.append(
-                            self.var_manager.user_step_variables[user][step]
-                        )
+            for user in range(n_users):
+                user_vars = user_step_variables[user]
+                user_step_vars = [user_vars[step] for step in steps if step in user_vars]
                 
                 if user_step_vars:
-                    self.model.Add(sum(user_step_vars) <= k)
+                    add(sum(user_step_vars) <= k)
         
         # Add global limit based on minimum k
         if self.instance.at_most_k:
             min_k = min(k for k, _ in self.instance.at_most_k)
-            for user in range(self.instance.number_of_users):
-                user_vars = []
-                for step in range(self.instance.number_of_steps):
-                    if step in self.var_manager.user_step_variables[user]:
-                        user_vars.append(self.var_manager.user_step_variables[user][step])
+            n_steps = self.instance.number_of_steps
+            for user in range(n_users):
+                user_steps = user_step_variables[user]
+                user_vars = [user_steps[step] for step in range(n_steps) if step in user_steps]
                 if user_vars:
-                    self.model.Add(sum(user_vars) <= min_k)
+                    add(sum(user_vars) <= min_k)
                     
         return True
 
@@ -258,17 +273,20 @@ class OneTeamConstraint(BaseConstraint):
         return True, []
 
     def add_to_model(self) -> bool:
+        step_variables = self.var_manager.step_variables
+        add = self.model.Add
         for steps, teams in self.instance.one_team:
             team_vars = [self.model.NewBoolVar(f'team_{i}') 
                         for i in range(len(teams))]
             self.model.AddExactlyOne(team_vars)
             
             for step in steps:
+                step_vars = step_variables[step]
                 for team_idx, team in enumerate(teams):
                     team_var = team_vars[team_idx]
-                    for user, var in self.var_manager.step_variables[step]:
+                    for user, var in step_vars:
                         if user not in team:
-                            self.model.Add(var == 0).OnlyEnforceIf(team_var)
+                            add(var == 0).OnlyEnforceIf(team_var)
         return True
 
 
@@ -312,12 +330,13 @@ class SUALConstraint(BaseConstraint):
         for scope, h, super_users in self.instance.sual:
             # For each step in scope
             for step in scope:
+                user_vars = self.var_manager.get_step_variables(step)
+
                 # Get all users assigned to this step
-                step_vars = [var for _, var in self.var_manager.get_step_variables(step)]
+                step_vars = [var for _, var in user_vars]
                 
                 # Get super users assigned to this step
-                super_vars = [var for user, var in self.var_manager.get_step_variables(step)
-                            if user in super_users]
+                super_vars = [var for user, var in user_vars if user in super_users]
                 
                 # Create indicator for when total assignments <= h
                 condition = self.model.NewBoolVar(f'sual_cond_{step}')
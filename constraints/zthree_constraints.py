@@ -1,9 +1,15 @@
 from typing import List, Tuple, Dict, Set
 from abc import ABC, abstractmethod
 from collections import defaultdict
+import weakref
 import z3
 
 
+# Always-on base encoding (exactly one user per step) serialized to SMT-LIB per instance,
+# so repeated solves of the same instance replay it instead of re-encoding every step
+_BASE_SMTLIB_CACHE = weakref.WeakKeyDictionary()
+
+
 class Z3VariableManager:
     """Manages Z3 variables for the WSP problem"""
     def __init__(self, solver: z3.Solver, instance):
@@ -18,14 +24,20 @@ class Z3VariableManager:
             self.step_variables.clear()
             self.user_step_variables.clear()
             
+            n_steps = self.instance.number_of_steps
+            n_users = self.instance.number_of_users
+            matrix = self.instance.user_step_matrix
+            step_variables = self.step_variables
+            user_step_variables = self.user_step_variables
+
             # Create variables only for authorized user-step pairs
-            for step in range(self.instance.number_of_steps):
-                self.step_variables[step] = []
-                for user in range(self.instance.number_of_users):
-                    if self.instance.user_step_matrix[user][step]:
+            for step in range(n_steps):
+                step_vars = step_variables[step] = []
+                for user in range(n_users):
+                    if matrix[user][step]:
                         var = z3.Bool(f's{step + 1}_u{user + 1}')
-                        self.step_variables[step].append((user, var))
-                        self.user_step_variables[user][step] = var
+                        step_vars.append((user, var))
+                        user_step_variables[user][step] = var
                         
             self._initialized = True
             return True
@@ -51,13 +63,15 @@ class Z3VariableManager:
 
     def get_authorized_users(self, step: int) -> Set[int]:
         """Get set of users authorized for a step"""
+        matrix = self.instance.user_step_matrix
         return {user for user in range(self.instance.number_of_users)
-                if self.instance.user_step_matrix[user][step]}
+                if matrix[user][step]}
 
     def get_authorized_steps(self, user: int) -> Set[int]:
         """Get set of steps a user is authorized for"""
+        user_row = self.instance.user_step_matrix[user]
         return {step for step in range(self.instance.number_of_steps)
-                if self.instance.user_step_matrix[user][step]}
+                if user_row[step]}
 
     def get_department_authorized_users(self, step: int, department: Set[int]) -> Set[int]:
         """Get users from a specific department authorized for a step"""
@@ -82,8 +96,9 @@ class Z3VariableManager:
         self._check_initialized()
         
         assignment = {}
+        step_variables = self.step_variables
         for step in range(self.instance.number_of_steps):
-            for user, var in self.step_variables[step]:
+            for user, var in step_variables[step]:
                 if z3.is_true(model[var]):
                     assignment[step + 1] = user + 1
                     break
@@ -156,9 +171,10 @@ class Z3ConstraintManager:
 class Z3AuthorizationConstraint(Z3Constraint):
     def check_feasibility(self) -> Tuple[bool, List[str]]:
         infeasible_steps = []
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for step in range(self.instance.number_of_steps):
-            if not any(self.instance.user_step_matrix[user][step] 
-                      for user in range(self.instance.number_of_users)):
+            if not any(matrix[user][step] for user in range(n_users)):
                 infeasible_steps.append(step + 1)
                 
         return (len(infeasible_steps) == 0, 
@@ -169,18 +185,25 @@ class Z3AuthorizationConstraint(Z3Constraint):
         if not is_feasible:
             return False
             
-        for step, user_vars in self.var_manager.step_variables.items():
-            # Exactly one user per step
-            self.solver.add(z3.PbEq([(var, 1) for _, var in user_vars], 1))
+        base = _BASE_SMTLIB_CACHE.get(self.instance)
+        if base is None:
+            base_solver = z3.Solver()
+            for step, user_vars in self.var_manager.step_variables.items():
+                # Exactly one user per step
+                base_solver.add(z3.PbEq([(var, 1) for _, var in user_vars], 1))
+            base = _BASE_SMTLIB_CACHE[self.instance] = base_solver.sexpr()
+
+        self.solver.from_string(base)
         return True
 
 class Z3BindingOfDutyConstraint(Z3Constraint):
     def check_feasibility(self) -> Tuple[bool, List[str]]:
         infeasible = []
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for s1, s2 in self.instance.BOD:
-            common_users = {user for user in range(self.instance.number_of_users)
-                          if (self.instance.user_step_matrix[user][s1] and 
-                              self.instance.user_step_matrix[user][s2])}
+            common_users = {user for user in range(n_users)
+                          if matrix[user][s1] and matrix[user][s2]}
             if not common_users:
                 infeasible.append((s1 + 1, s2 + 1))
                 
@@ -193,13 +216,13 @@ class Z3BindingOfDutyConstraint(Z3Constraint):
         if not is_feasible:
             return False
             
+        n_users = self.instance.number_of_users
+        user_step_variables = self.var_manager.user_step_variables
         for s1, s2 in self.instance.BOD:
-            for user in range(self.instance.number_of_users):
-                if (s1 in self.var_manager.user_step_variables[user] and 
-                    s2 in self.var_manager.user_step_variables[user]):
-                    var1 = self.var_manager.user_step_variables[user][s1]
-                    var2 = self.var_manager.user_step_variables[user][s2]
-                    self.solver.add(var1 == var2)
+            for user in range(n_users):
+                user_vars = user_step_variables[user]
+                if s1 in user_vars and s2 in user_vars:
+                    self.solver.add(user_vars[s1] == user_vars[s2])
         return True
 
 class Z3SeparationOfDutyConstraint(Z3Constraint):
@@ -207,21 +230,23 @@ class Z3SeparationOfDutyConstraint(Z3Constraint):
         return True, []
 
     def add_to_solver(self) -> bool:
+        n_users = self.instance.number_of_users
+        user_step_variables = self.var_manager.user_step_variables
         for s1, s2 in self.instance.SOD:
-            for user in range(self.instance.number_of_users):
-                if (s1 in self.var_manager.user_step_variables[user] and 
-                    s2 in self.var_manager.user_step_variables[user]):
-                    var1 = self.var_manager.user_step_variables[user][s1]
-                    var2 = self.var_manager.user_step_variables[user][s2]
-                    self.solver.add(z3.Not(z3.And(var1, var2)))
+            for user in range(n_users):
+                user_vars = user_step_variables[user]
+                if s1 in user_vars and s2 in user_vars:
+                    self.solver.add(z3.Not(z3.And(user_vars[s1], user_vars[s2])))
         return True
 
 class Z3AtMostKConstraint(Z3Constraint):
     def check_feasibility(self) -> Tuple[bool, List[str]]:
         infeasible = []
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for k, steps in self.instance.at_most_k:
-            total_users = len(set(u for u in range(self.instance.number_of_users)
-                                for s in steps if self.instance.user_step_matrix[u][s]))
+            total_users = len(set(u for u in range(n_users)
+                                for s in steps if matrix[u][s]))
             min_users_needed = len(steps) / k
             if total_users < min_users_needed:
                 infeasible.append((k, steps, total_users, min_users_needed))
@@ -236,12 +261,13 @@ class Z3AtMostKConstraint(Z3Constraint):
         if not is_feasible:
             return False
             
+        n_users = self.instance.number_of_users
+        n_steps = self.instance.number_of_steps
+        user_step_variables = self.var_manager.user_step_variables
         for k, steps in self.instance.at_most_k:
-            for user in range(self.instance.number_of_users):
-                user_step_vars = []
-                for step in steps:
-                    if step in self.var_manager.user_step_variables[user]:
-                        user_step_vars.append(self.var_manager.user_step_variables[user][step])
+            for user in range(n_users):
+                user_vars = user_step_variables[user]
+                user_step_vars = [user_vars[step] for step in steps if step in user_vars]
                 
                 if user_step_vars:
                     self.solver.add(z3.PbLe([(var, 1) for var in user_step_vars], k))
@@ -249,11 +275,9 @@ class Z3AtMostKConstraint(Z3Constraint):
         # Add global limit based on minimum k
         if self.instance.at_most_k:
             min_k = min(k for k, _ in self.instance.at_most_k)
-            for user in range(self.instance.number_of_users):
-                user_vars = []
-                for step in range(self.instance.number_of_steps):
-                    if step in self.var_manager.user_step_variables[user]:
-                        user_vars.append(self.var_manager.user_step_variables[user][step])
+            for user in range(n_users):
+                user_step_map = user_step_variables[user]
+                user_vars = [user_step_map[step] for step in range(n_steps) if step in user_step_map]
                 if user_vars:
                     self.solver.add(z3.PbLe([(var, 1) for var in user_vars], min_k))
                     
@@ -275,13 +299,11 @@ class Z3OneTeamConstraint(Z3Constraint):
             for step in steps:
                 for user, var in self.var_manager.get_step_variables(step):
                     # User can only be assigned if they're in the chosen team
-                    user_team_assignments = []
-                    for team_idx, team in enumerate(teams):
-                        if user in team:
-                            user_team_assignments.append(team_vars[team_idx])
+                    user_team_assignments = [team_vars[team_idx] for team_idx, team in enumerate(teams)
+                                             if user in team]
                     
                     if user_team_assignments:
-                        self.solver.add(z3.Implies(var, z3.Or(user_team_assignments)))
+                        self.solver.add(z3.Implies(var, z3.Or(*user_team_assignments)))
                     else:
                         self.solver.add(z3.Not(var))
         return True
@@ -338,7 +360,7 @@ class Z3SUALConstraint(Z3Constraint):
                     # Add constraint: if step_count <= h, must use super user
                     condition = step_count <= h
                     if super_vars:
-                        self.solver.add(z3.Implies(condition, z3.Or(super_vars)))
+                        self.solver.add(z3.Implies(condition, z3.Or(*super_vars)))
                         
         return True
 
@@ -393,7 +415,7 @@ class Z3WangLiConstraint(Z3Constraint):
                     
                     # User can only be assigned if they're in the chosen department
                     if user_dept_assignments:
-                        self.solver.add(z3.Implies(var, z3.Or(user_dept_assignments)))
+                        self.solver.add(z3.Implies(var, z3.Or(*user_dept_assignments)))
                     else:
                         self.solver.add(z3.Not(var))
                         
@@ -446,8 +468,8 @@ class Z3AssignmentDependentConstraint(Z3Constraint):
             
             # If source used, must assign to target user
             if target_vars:
-                self.solver.add(z3.Implies(source_used, 
-                                         z3.Or([var[1] for var in target_vars])))
+                self.solver.add(z3.Implies(source_used,
+                                         z3.Or(*[var for _, var in target_vars])))
             
             # When source used, non-target users cannot be assigned
             for user, var in self.var_manager.get_step_variables(s2):
@@ -1,7 +1,8 @@
-from collections import defaultdict
 import time
 from typing import Dict, List, Set, Tuple
 
+import numpy as np
+
 from utils import log
 from typings import Solution
 
@@ -72,11 +73,12 @@ class BaseSolver:
 
     def _check_bod_conflicts(self, conflicts: List[Dict]):
         """Check for BOD authorization gaps"""
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for s1, s2 in self.instance.BOD:
             common_users = set()
-            for user in range(self.instance.number_of_users):
-                if (self.instance.user_step_matrix[user][s1] and 
-                    self.instance.user_step_matrix[user][s2]):
+            for user in range(n_users):
+                if matrix[user][s1] and matrix[user][s2]:
                     common_users.add(user)
             if not common_users:
                 conflicts.append({
@@ -97,9 +99,10 @@ class BaseSolver:
 
     def _check_authorization_gaps(self, conflicts: List[Dict]):
         """Check for steps with no authorized users"""
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for step in range(self.instance.number_of_steps):
-            authorized = sum(1 for u in range(self.instance.number_of_users)
-                        if self.instance.user_step_matrix[u][step])
+            authorized = sum(1 for u in range(n_users) if matrix[u][step])
             if authorized == 0:
                 conflicts.append({
                     "Type": "Authorization Gap",
@@ -108,9 +111,11 @@ class BaseSolver:
 
     def _check_at_most_k_feasibility(self, conflicts: List[Dict]):
         """Check if at-most-k constraints can be satisfied"""
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
         for k, steps in self.instance.at_most_k:
-            total_users = len(set(u for u in range(self.instance.number_of_users)
-                                for s in steps if self.instance.user_step_matrix[u][s]))
+            total_users = len(set(u for u in range(n_users)
+                                for s in steps if matrix[u][s]))
             min_users_needed = len(steps) / k
             if total_users < min_users_needed:
                 conflicts.append({
@@ -253,18 +258,19 @@ class BaseSolver:
             self.statistics["solution_status"]["UNSAT Reason"] = result.reason
 
         # Problem Size section (always include)
+        n_steps = self.instance.number_of_steps
+        n_users = self.instance.number_of_users
         total_auth = sum(sum(1 for x in row if x) for row in self.instance.user_step_matrix)
-        auth_density = (total_auth / (self.instance.number_of_steps * self.instance.number_of_users)) * 100
-        constraint_density = (self.instance.number_of_constraints / 
-                            (self.instance.number_of_steps * self.instance.number_of_users)) * 100
+        auth_density = (total_auth / (n_steps * n_users)) * 100
+        constraint_density = (self.instance.number_of_constraints / (n_steps * n_users)) * 100
         
         self.statistics["problem_size"] = {
-            "Total Steps": self.instance.number_of_steps,
-            "Total Users": self.instance.number_of_users,
+            "Total Steps": n_steps,
+            "Total Users": n_users,
             "Total Constraints": self.instance.number_of_constraints,
             "Authorization Density": f"{auth_density:.2f}%",
             "Constraint Density": f"{constraint_density:.2f}%",
-            "Step-User Ratio": f"{self.instance.number_of_steps / self.instance.number_of_users:.2f}"
+            "Step-User Ratio": f"{n_steps / n_users:.2f}"
         }
 
         # Workload Distribution
@@ -277,22 +283,23 @@ class BaseSolver:
         }
         
         if result.is_sat and hasattr(result, 'assignment'):
-            user_assignments = defaultdict(list)
-            for step, user in result.assignment.items():
-                user_assignments[user].append(step)
+            assignment = result.assignment
+            users = np.fromiter(assignment.values(), dtype=np.int64, count=len(assignment))
+            counts = np.bincount(users)
+            counts = counts[counts > 0]
 
-            active_users = len(user_assignments)
+            active_users = counts.size
             if active_users > 0:
-                max_steps = max(len(steps) for steps in user_assignments.values())
-                min_steps = min(len(steps) for steps in user_assignments.values())
-                avg_steps = sum(len(steps) for steps in user_assignments.values()) / active_users
+                max_steps = int(counts.max())
+                min_steps = int(counts.min())
+                avg_steps = float(counts.mean())
                 
                 self.statistics["workload_distribution"].update({
-                    "Active Users": f"{active_users} of {self.instance.number_of_users}",
+                    "Active Users": f"{active_users} of {n_users}",
                     "Maximum Assignment": f"{max_steps} steps",
                     "Minimum Assignment": f"{min_steps} steps",
                     "Average Assignment": f"{avg_steps:.1f} steps",
-                    "User Utilization": f"{(active_users / self.instance.number_of_users) * 100:.1f}%"
+                    "User Utilization": f"{(active_users / n_users) * 100:.1f}%"
                 })
 
         # Constraint Compliance
@@ -353,19 +360,21 @@ class BaseSolver:
             "Summary": {}
         }
         
+        n_steps = self.instance.number_of_steps
+        n_users = self.instance.number_of_users
+        matrix = self.instance.user_step_matrix
+
         # Per-step breakdown
-        for step in range(self.instance.number_of_steps):
-            authorized_users = [u+1 for u in range(self.instance.number_of_users)
-                              if self.instance.user_step_matrix[u][step]]
+        for step in range(n_steps):
+            authorized_users = [u+1 for u in range(n_users) if matrix[u][step]]
             auth_analysis["Per Step Breakdown"][f"Step {step+1}"] = {
                 "Authorized Users": sorted(authorized_users),
                 "Total": len(authorized_users)
             }
             
         # Per-user breakdown
-        for user in range(self.instance.number_of_users):
-            authorized_steps = [s+1 for s in range(self.instance.number_of_steps)
-                              if self.instance.user_step_matrix[user][s]]
+        for user in range(n_users):
+            authorized_steps = [s+1 for s in range(n_steps) if matrix[user][s]]
             if authorized_steps:  # Only include users with authorizations
                 auth_analysis["Per User Breakdown"][f"User {user+1}"] = {
                     "Authorized Steps": sorted(authorized_steps),
@@ -394,9 +403,8 @@ class BaseSolver:
 
         # BOD constraints
         for s1, s2 in self.instance.BOD:
-            common_users = [u+1 for u in range(self.instance.number_of_users)
-                          if (self.instance.user_step_matrix[u][s1] and 
-                              self.instance.user_step_matrix[u][s2])]
+            common_users = [u+1 for u in range(n_users)
+                          if matrix[u][s1] and matrix[u][s2]]
             constraint_analysis["Binding of Duty"].append({
                 "Steps": f"{s1+1} and {s2+1}",
                 "Common Users": sorted(common_users),
@@ -13,8 +13,10 @@ class Z3Solver(BaseSolver):
     """Z3 solver implementation for WSP instances"""
     SOLVER_TYPE = SolverType.Z_THREE
 
-    def __init__(self, instance, active_constraints: Dict[str, bool], gui_mode: bool = False):
+    def __init__(self, instance, active_constraints: Dict[str, bool], gui_mode: bool = False,
+                 parallel: bool = False):
         super().__init__(instance, active_constraints, gui_mode)
+        self.parallel = parallel
         self.solver = z3.Solver()
         self._setup_solver()
         
@@ -26,12 +28,20 @@ class Z3Solver(BaseSolver):
         """Configure Z3 solver parameters"""
         # Set timeout to 5 minutes
         self.solver.set("timeout", 300000)
-        
-        # Enable parallel solving if available
-        self.solver.set("parallel.enable", True)
-        
-        # Use tactical solving
-        self.solver.set("smt.tactical_solving", True)
+
+    def _check(self):
+        """Run the solver, switching on Z3's parallel portfolio for this check when requested"""
+        # Parallel portfolio pays thread startup and context copies on every check(),
+        # which outweighs its benefit on the small incremental queries WSP issues.
+        # parallel.enable is a global parameter, so it is restored afterwards.
+        if not self.parallel:
+            return self.solver.check()
+        previous = z3.get_param("parallel.enable")
+        z3.set_param("parallel.enable", True)
+        try:
+            return self.solver.check()
+        finally:
+            z3.set_param("parallel.enable", previous)
 
     def solve(self):
         """Main solving method"""
@@ -49,7 +59,7 @@ class Z3Solver(BaseSolver):
                 return result
 
             log(self.gui_mode, "Solving model...")
-            status = self.solver.check()
+            status = self._check()
             
             self.solve_time = time.time() - start_time
             
@@ -125,17 +135,13 @@ class Z3Solver(BaseSolver):
 
     def _check_solution_uniqueness(self, solution: Dict[int, int]) -> bool:
         """Check if solution is unique by trying to find another one"""
-        # Create blocking clause
-        blocking_clause = []
-        for step, user in solution.items():
-            # Negate current assignment
-            blocking_clause.append(
-                z3.Not(self.var_manager.user_step_variables[user-1][step-1])
-            )
-            
-        # Add blocking clause
-        self.solver.add(z3.Or(blocking_clause))
+        # Block current assignment: at least one chosen step-user pair must change
+        user_step_variables = self.var_manager.user_step_variables
+        self.solver.add(z3.Or(*[
+            z3.Not(user_step_variables[user-1][step-1])
+            for step, user in solution.items()
+        ]))
         
         # Check for another solution
-        status = self.solver.check()
+        status = self._check()
         return status == z3.unsat  # Unique if no other solution exists
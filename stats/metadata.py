@@ -1,18 +1,161 @@
 import json
+import mmap
 import os
 import os.path
-from collections import defaultdict
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Marks comparison columns that every metadata record must have
+_REQUIRED = object()
+
+
+def dump_json(obj: Any, pretty: bool = True) -> bytes:
+    """Serialize metadata to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        # Non-string keys (e.g. step numbers) are stringified like the stdlib does
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, indent=2).encode()
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+
+def drop_page_cache(f) -> None:
+    """Tell the kernel a fully read file's pages are no longer needed"""
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _resolve(record: Dict[str, Any], path: Tuple[str, ...], default: Any) -> Any:
+    """Follow path into a nested record, falling back to default unless it is required"""
+    value = record
+    try:
+        for key in path:
+            value = value[key]
+    except KeyError:
+        if default is _REQUIRED:
+            raise
+        return default
+    return value
+
+
+def _close_archive(f) -> None:
+    """Sync and close an archive handle"""
+    f.flush()
+    os.fsync(f.fileno())
+    f.close()
+
+
+@lru_cache(maxsize=None)
+def _decode_mask(mask: int, order: Tuple[str, ...]) -> Tuple[Tuple[str, bool], ...]:
+    """(constraint type, active) pairs of an active_mask, decoded once per distinct mask"""
+    return tuple((ctype, bool(mask >> bit & 1)) for bit, ctype in enumerate(order))
+
+
+def iso_timestamp(metadata: Dict[str, Any]) -> Optional[str]:
+    """ISO-8601 save time of a metadata record, including records written before timestamp_unix"""
+    if 'timestamp_unix' in metadata:
+        return datetime.fromtimestamp(metadata['timestamp_unix']).isoformat()
+    return metadata.get('timestamp')
+
+
+def load_json(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+MMAP_MIN_SIZE = 16 * 1024  # Below this a plain read is cheaper than setting up a mapping
+
+
+def read_json_file(f, size: Optional[int] = None) -> Any:
+    """Parse an open binary JSON file, decoding large files straight from a memory map"""
+    if size is None:
+        size = os.fstat(f.fileno()).st_size
+    # The stdlib parser needs a bytes copy anyway, so only orjson benefits from mapping
+    if orjson is not None and size >= MMAP_MIN_SIZE:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer, memoryview(buffer) as view:
+            return orjson.loads(view)
+    return load_json(f.read())
 
 
 class MetadataHandler:
     """Handles saving and loading of WSP solution metadata"""
+    ARCHIVE_FILENAME = "metadata.jsonl"
+    # Bit i of a record's active_mask is set when CONSTRAINT_ORDER[i] was active
+    CONSTRAINT_ORDER = ('authorizations', 'separation_of_duty', 'binding_of_duty', 'at_most_k',
+                        'one_team', 'super_user_at_least', 'wang_li', 'assignment_dependent')
+    # Below this many files a thread pool costs more than it overlaps
+    PARALLEL_LOAD_THRESHOLD = 8
+    # Archive records written between fsyncs; a power loss loses at most this many
+    ARCHIVE_FSYNC_INTERVAL = 50
+    # Comparison column -> (path into a metadata record, default when absent)
+    COMPARISON_SCHEMA = (
+        ('filenames', ('instance', 'filename'), _REQUIRED),
+        ('num_steps', ('instance', 'details', 'Total Steps'), _REQUIRED),
+        ('num_users', ('instance', 'details', 'Total Users'), _REQUIRED),
+        ('num_constraints', ('instance', 'details', 'Total Constraints'), _REQUIRED),
+        ('solving_times', ('metrics', 'solving_time_ms'), _REQUIRED),
+        ('solutions_found', ('metrics', 'solution_found'), _REQUIRED),
+        ('uniqueness', ('metrics', 'solution_unique'), _REQUIRED),
+        ('violations', ('metrics', 'constraint_violations'), 0),
+        ('authorization_analysis', ('instance', 'details', 'authorization_analysis'), {}),
+        ('avg_steps_per_user', ('instance', 'details', 'workload_distribution', 'avg_steps_per_user'), 0),
+        ('max_steps_per_user', ('instance', 'details', 'workload_distribution', 'max_steps_per_user'), 0),
+        ('utilization_percentage', ('instance', 'details', 'workload_distribution', 'utilization_percentage'), 0),
+    )
+    # Homogeneous numeric columns are returned as numpy arrays of these dtypes
+    NUMERIC_COLUMNS = {
+        'num_steps': np.int64,
+        'num_users': np.int64,
+        'num_constraints': np.int64,
+        'solving_times': np.float64,
+        'solutions_found': np.bool_,
+        'violations': np.int64,
+        'avg_steps_per_user': np.float64,
+        'max_steps_per_user': np.float64,
+        'utilization_percentage': np.float64,
+    }
+    _constraint_columns: Dict[str, Tuple[str, str]] = {}
     
-    def __init__(self, output_dir: str = "results/metadata"):
-        self.output_dir = output_dir
+    def __init__(self, output_dir: str = "results/metadata", pretty: bool = False):
+        self.output_dir = Path(output_dir)
+        # Indented per-instance files are for reading by hand; compact is smaller and faster
+        self.pretty = pretty
+        # Append-only history of every save, one JSON document per line. Loaders never read it:
+        # the per-instance files are the results, so deleting one removes that result.
+        self.archive_file = self.output_dir / self.ARCHIVE_FILENAME
+        self._archive = None
+        self._archive_finalizer = None
+        self._archive_writes = 0
+        # filename -> (mtime_ns, parsed metadata); a file is parsed once until it changes
+        self._file_cache: Dict[str, Tuple[int, Dict]] = {}
+        self._file_cache_lock = threading.Lock()  # load_all_results fills it from worker threads
+        self._results_cache = None
+        self._results_cache_key = None
 
-        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def metadata_filename(filename: str) -> str:
+        """Name of the per-instance metadata file for an instance file"""
+        return f"{os.path.splitext(filename)[0]}_metadata.json"
         
     def save(self, instance_details: Dict[str, Any],
                     solver_result: Dict[str, Any],
@@ -20,19 +163,22 @@ class MetadataHandler:
                     active_constraints: Dict[str, bool],
                     filename: str) -> str:
         """Save complete metadata for a WSP instance solution."""
+        sat = solver_result.get('sat') == 'sat'
+        violations = solver_result.get('violations') if sat else None
+
         # Extract authorization from solution if available
         authorization_analysis = {}
-        if solver_result.get('sat') == 'sat' and solver_result.get('sol'):
-            per_step = defaultdict(list)
-            per_user = defaultdict(list)
+        if sat and solver_result.get('sol'):
+            per_step = {}
+            per_user = {}
             for assign in solver_result['sol']:
-                step = assign['step']
-                user = assign['user']
-                per_step[f's{step}'].append(f'u{user}')
-                per_user[f'u{user}'].append(f's{step}')
+                step = f"s{assign['step']}"
+                user = f"u{assign['user']}"
+                per_step.setdefault(step, []).append(user)
+                per_user.setdefault(user, []).append(step)
             authorization_analysis = {
-                'per_step': dict(per_step),
-                'per_user': dict(per_user)
+                'per_step': per_step,
+                'per_user': per_user
             }
 
         constraint_distribution = instance_details.get('constraint_distribution', {})        
@@ -50,7 +196,7 @@ class MetadataHandler:
         }
         
         metadata = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp_unix": time.time(),
             "instance": {
                 "filename": filename,
                 "details": {
@@ -67,95 +213,275 @@ class MetadataHandler:
             },
             "solver": {
                 "type": solver_type,
-                "active_constraints": active_constraints,
+                **self.encode_active_constraints(active_constraints),
                 "results": solver_result
             },
             "metrics": {
                 "solving_time_ms": solver_result.get('exe_time', 0),
-                "solution_found": solver_result.get('sat') == 'sat',
+                "solution_found": sat,
                 "solution_unique": solver_result.get('is_unique', None),
-                "constraint_violations": len(solver_result.get('violations', [])) if solver_result.get('sat') == 'sat' else 0,
+                "constraint_violations": len(violations) if violations else 0,
             }
         }
         
-        output_file = os.path.join(
-            self.output_dir,
-            f"{os.path.splitext(filename)[0]}_metadata.json"
-        )
+        name = self.metadata_filename(filename)
+        output_file = self.output_dir / name
+        record = dump_json(metadata, pretty=False)
+        previous = None
+        if self._results_cache is not None:
+            try:
+                previous = os.stat(output_file)
+            except FileNotFoundError:
+                pass
         
-        with open(output_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        # Going through a temporary file means readers never see a half-written document.
+        # The buffered writer retries short writes, so the whole document is on disk before fsync.
+        tmp_file = output_file.with_name(output_file.name + '.tmp')
+        with open(tmp_file, 'wb') as f:
+            f.write(dump_json(metadata, pretty=True) if self.pretty else record)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, output_file)
+
+        self._append_to_archive(record + b'\n')
+
+        self._index_saved(name, record, previous, os.stat(output_file))
             
-        return output_file 
+        return str(output_file)
     
+    def _append_to_archive(self, record: bytes):
+        """Append a record through a long-lived handle, fsyncing in batches"""
+        if self._archive is None:
+            self._archive = open(self.archive_file, 'ab')
+            if self._archive.tell() and not self._archive_ends_with_newline():
+                # Terminate a record torn by an interrupted save so it cannot swallow the next one
+                self._archive.write(b'\n')
+            # Closes the handle at exit or once the handler is collected, without keeping it alive
+            self._archive_finalizer = weakref.finalize(self, _close_archive, self._archive)
+
+        # Flushed straight away so other handlers and processes see the record
+        self._archive.write(record)
+        self._archive.flush()
+        self._archive_writes += 1
+        if self._archive_writes % self.ARCHIVE_FSYNC_INTERVAL == 0:
+            os.fsync(self._archive.fileno())
+
+    def _archive_ends_with_newline(self) -> bool:
+        """Whether the archive's last record is complete"""
+        with open(self.archive_file, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def close(self):
+        """Sync and close the archive handle"""
+        if self._archive is not None:
+            self._archive_finalizer()
+            self._archive = None
+
     def load(self, filename: str) -> Optional[Dict]:
         """Load metadata from file"""
-        filepath = os.path.join(self.output_dir, filename)
-        if not os.path.exists(filepath):
+        filepath = self.output_dir / filename
+        try:
+            mtime = os.stat(filepath).st_mtime_ns
+        except FileNotFoundError:
             return None
+        metadata = self._load_cached(filename, filepath, mtime)
+        # Shallow copies, so callers that edit a result leave the cached one untouched
+        return dict(metadata) if metadata is not None else None
+
+    def _load_from_entry(self, entry: os.DirEntry) -> Optional[Dict]:
+        """Load metadata from a scanned directory entry, reusing its cached stat"""
+        return self._load_cached(entry.name, entry.path, entry.stat().st_mtime_ns)
+
+    def _load_cached(self, filename: str, filepath, mtime: int) -> Optional[Dict]:
+        """Return the parsed file, re-reading it only when its mtime has changed"""
+        with self._file_cache_lock:
+            cached = self._file_cache.get(filename)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        metadata = self._read_file(filepath)
+        if metadata is None:
+            return None
+        with self._file_cache_lock:
+            self._file_cache[filename] = (mtime, metadata)
+        return metadata
             
-        with open(filepath) as f:
-            return json.load(f)
-            
-    def load_all_results(self) -> List[Dict]:
-        """Load all metadata files in output directory"""
-        results = []
-        for filename in os.listdir(self.output_dir):
-            if filename.endswith('_metadata.json'):
-                metadata = self.load(filename)
+    @staticmethod
+    def _read_file(filepath) -> Optional[Dict]:
+        """Read and parse one metadata file, or None if it no longer exists"""
+        try:
+            with open(filepath, 'rb') as f:
+                metadata = read_json_file(f)
+                drop_page_cache(f)
+        except FileNotFoundError:
+            return None  # Removed since it was listed
+        return metadata
+
+    def invalidate(self, filename: Optional[str] = None):
+        """Drop cached results, and the parsed copy of filename if given (all files otherwise)"""
+        with self._file_cache_lock:
+            if filename is None:
+                self._file_cache.clear()
+            else:
+                self._file_cache.pop(filename, None)
+        self._results_cache = None
+        self._results_cache_key = None
+
+    def _index_saved(self, name: str, record: bytes, previous: Optional[os.stat_result],
+                     current: os.stat_result):
+        """Fold a just-saved record into the results cache, moving its key past our own write"""
+        with self._file_cache_lock:
+            self._file_cache.pop(name, None)
+        if self._results_cache is None:
+            return
+        # Derived from the old key and the file's stats before and after the write, so it only
+        # matches the directory on the next load if no other writer changed it meanwhile
+        count, newest, size = self._results_cache_key
+        if previous is None:
+            count += 1
+        else:
+            size -= previous.st_size
+        self._results_cache[name] = load_json(record)
+        self._results_cache_key = (count, max(newest, current.st_mtime_ns), size + current.st_size)
+
+    def _scan_directory(self) -> List[os.DirEntry]:
+        """List the per-instance metadata files in output directory in a single scandir pass"""
+        with os.scandir(self.output_dir) as entries:
+            return [entry for entry in entries if entry.name.endswith('_metadata.json') and entry.is_file()]
+
+    @staticmethod
+    def _directory_state(entries: List[os.DirEntry]):
+        """Cheap fingerprint of the metadata files: count, newest mtime and total size"""
+        stats = [entry.stat() for entry in entries]
+        return (len(stats),
+                max((st.st_mtime_ns for st in stats), default=0),
+                sum(st.st_size for st in stats))
+
+    def _results_cache_valid(self, cache_key) -> bool:
+        """Whether the cached results still match the output directory"""
+        return self._results_cache is not None and self._results_cache_key == cache_key
+
+    def _iter_results(self, entries: List[os.DirEntry]) -> Iterator[Tuple[str, Dict]]:
+        """Yield (metadata filename, metadata) of every per-instance file in the scanned entries"""
+        if len(entries) < self.PARALLEL_LOAD_THRESHOLD:
+            for entry in entries:
+                metadata = self._load_from_entry(entry)
                 if metadata:
-                    results.append(metadata)
-        return results
-        
-    def get_comparison_data(self, filenames: List[str]) -> Dict[str, List]:
-        """Load metadata for instances, handling UNSAT cases"""
-        comparison_data = defaultdict(list)
+                    yield entry.name, metadata
+            return
+
+        # Yield each file as soon as it is parsed, in listing order, instead of after all of them
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+            for entry, metadata in zip(entries, executor.map(self._load_from_entry, entries)):
+                if metadata:
+                    yield entry.name, metadata
+
+    def iter_all_results(self) -> Iterator[Dict]:
+        """Yield the latest metadata of every instance as each file is parsed, without building a list"""
+        entries = self._scan_directory()
+        cache_key = self._directory_state(entries)
+        if self._results_cache_valid(cache_key):
+            for metadata in list(self._results_cache.values()):
+                yield dict(metadata)
+            return
+
+        for _, metadata in self._iter_results(entries):
+            yield dict(metadata)
+
+    def load_all_results(self) -> List[Dict]:
+        """Load the latest metadata of every instance in output directory"""
+        entries = self._scan_directory()
+        cache_key = self._directory_state(entries)
+        if not self._results_cache_valid(cache_key):
+            self._results_cache = dict(self._iter_results(entries))
+            self._results_cache_key = cache_key
+        return [dict(metadata) for metadata in self._results_cache.values()]
         
-        for filename in filenames:
-            metadata = self.load(
-                f"{os.path.splitext(filename)[0]}_metadata.json"
-            )
+    def get_comparison_data(self, filenames: List[str]) -> Dict[str, Union[List, np.ndarray]]:
+        """Load metadata for instances (instance or metadata filenames), handling UNSAT cases"""
+        targets = [filename if filename.endswith('_metadata.json') else self.metadata_filename(filename)
+                   for filename in filenames]
+        records = []
+        for target in targets:
+            metadata = self.load(target)
             if metadata:
-                # Basic instance info
-                comparison_data['filenames'].append(metadata['instance']['filename'])
-                comparison_data['num_steps'].append(metadata['instance']['details']['Total Steps'])
-                comparison_data['num_users'].append(metadata['instance']['details']['Total Users'])
-                comparison_data['num_constraints'].append(metadata['instance']['details']['Total Constraints'])
-                
-                # Constraint types
-                constraint_types = metadata['instance']['details'].get('constraint_types', {})
-                for ctype, count in constraint_types.items():
-                    comparison_data[f'constraint_{ctype}'].append(count)
-
-                # Get active constraints
-                active = metadata['solver']['active_constraints']
-                for ctype, is_active in active.items():
-                    comparison_data[f'constraint_{ctype}_active'].append(1 if is_active else 0)
-
-                # Solution status and metrics
-                comparison_data['solving_times'].append(metadata['metrics']['solving_time_ms'])
-                comparison_data['solutions_found'].append(metadata['metrics']['solution_found'])
-                comparison_data['uniqueness'].append(metadata['metrics']['solution_unique'])
-                comparison_data['violations'].append(metadata['metrics'].get('constraint_violations', 0))
-                
-                # Authorization details
-                auth_analysis = metadata['instance']['details'].get('authorization_analysis', {})
-                comparison_data['authorization_analysis'].append(auth_analysis)
-                
-                # Workload distribution
-                workload = metadata['instance']['details'].get('workload_distribution', {})
-                for metric in ['avg_steps_per_user', 'max_steps_per_user', 'utilization_percentage']:
-                    comparison_data[metric].append(workload.get(metric, 0))
-                
-                # Constraint details - now using active constraints
-                constraints = metadata['solver']['active_constraints']
-                for constraint_type, is_active in constraints.items():
-                    comparison_data[f'constraint_{constraint_type}'].append(1 if is_active else 0)
-                
-                # Violations if solution exists
-                if metadata['metrics']['solution_found']:
-                    comparison_data['constraint_violations'].append(
-                        len(metadata['solver']['results'].get('violations', []))
-                    )
-        
-        return dict(comparison_data)
+                records.append(metadata)
+
+        return self.build_comparison_data(records)
+
+    @classmethod
+    def encode_active_constraints(cls, active_constraints: Dict[str, bool]) -> Dict[str, Any]:
+        """Solver fields for the active constraints: a bitmask, or the dict itself if it is not the full set"""
+        if active_constraints.keys() != set(cls.CONSTRAINT_ORDER):
+            return {"active_constraints": active_constraints}
+        mask = 0
+        for bit, ctype in enumerate(cls.CONSTRAINT_ORDER):
+            if active_constraints.get(ctype):
+                mask |= 1 << bit
+        return {"active_mask": mask}
+
+    @classmethod
+    def active_constraints(cls, metadata: Dict[str, Any]) -> Dict[str, bool]:
+        """Active constraints of a record, decoding active_mask or reading the older dict"""
+        solver = metadata['solver']
+        mask = solver.get('active_mask')
+        if mask is None:
+            return solver['active_constraints']
+
+        return dict(_decode_mask(mask, cls.CONSTRAINT_ORDER))
+
+    @classmethod
+    def _constraint_column_names(cls, ctype: str) -> Tuple[str, str]:
+        """Count and active-flag column names for a constraint type"""
+        names = cls._constraint_columns.get(ctype)
+        if names is None:
+            names = cls._constraint_columns[ctype] = (f'constraint_{ctype}', f'constraint_{ctype}_active')
+        return names
+
+    @classmethod
+    def validate_record(cls, metadata: Dict[str, Any]) -> None:
+        """Raise KeyError or TypeError if a record lacks fields build_comparison_data needs"""
+        for _, path, default in cls.COMPARISON_SCHEMA:
+            if default is _REQUIRED:
+                _resolve(metadata, path, default)
+        cls.active_constraints(metadata)
+        metadata['solver']['results'].get('violations')
+
+    @classmethod
+    def build_comparison_data(cls, records: List[Dict[str, Any]]) -> Dict[str, Union[List, np.ndarray]]:
+        """Turn metadata records into column-oriented comparison data, numeric columns as arrays"""
+        n = len(records)
+        comparison_data = {}
+
+        # Fixed columns, filled column by column into presized lists
+        for column, path, default in cls.COMPARISON_SCHEMA:
+            values = [None] * n
+            for i, metadata in enumerate(records):
+                values[i] = _resolve(metadata, path, default)
+            dtype = cls.NUMERIC_COLUMNS.get(column)
+            if dtype is not None:
+                try:
+                    values = np.asarray(values, dtype=dtype)
+                except (TypeError, ValueError):
+                    pass  # Mixed values such as "N/A"; leave as a list for the plots to clean
+            comparison_data[column] = values
+
+        # Constraint columns over the union of types seen, zero for records without that type
+        type_counts = [metadata['instance']['details'].get('constraint_types', {}) for metadata in records]
+        active_flags = [cls.active_constraints(metadata) for metadata in records]
+        for rows, name_index in ((type_counts, 0), (active_flags, 1)):
+            for ctype in dict.fromkeys(ctype for row in rows for ctype in row):
+                values = np.zeros(n, dtype=np.int64)
+                for i, row in enumerate(rows):
+                    if ctype in row:
+                        values[i] = row[ctype]
+                comparison_data[cls._constraint_column_names(ctype)[name_index]] = values
+
+        # Violations if solution exists
+        constraint_violations = [len(metadata['solver']['results'].get('violations', []))
+                                 for metadata in records if metadata['metrics']['solution_found']]
+        if constraint_violations:
+            comparison_data['constraint_violations'] = np.asarray(constraint_violations, dtype=np.int64)
+
+        return comparison_data
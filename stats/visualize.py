@@ -1,26 +1,58 @@
-import json
 from typing import Optional
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import gc
+import hashlib
+import io
 import os
-import seaborn as sns
-from pathlib import Path
 
 from utils import log
+from .metadata import MetadataHandler, dump_json, load_json, read_json_file
 
 
 class Visualizer:
     """Generates visualizations for WSP metadata"""
     
-    def __init__(self, metadata_handler, output_dir: str = "results/plots", gui_mode: bool = False):
+    # Authorization plots with more cells than this are drawn as a heatmap instead of bars
+    AUTH_HEATMAP_THRESHOLD = 500
+    # Batch runs with at least this many plots render them in worker processes
+    PARALLEL_PLOT_THRESHOLD = 8
+    # Plots drawn between forced garbage collections
+    GC_INTERVAL = 4
+    # Correlation cells are only annotated with their value up to this many metrics
+    CORRELATION_ANNOTATE_LIMIT = 15
+    # Plots that would only draw a "no data" message unless one of these columns has a non-empty value
+    PLOT_REQUIRES = {
+        "step_authorizations": ('authorization_analysis',),
+        "user_authorizations": ('authorization_analysis',),
+        "workload_distribution": ('avg_steps_per_user', 'max_steps_per_user', 'utilization_percentage'),
+        "workload_distribution_line": ('avg_steps_per_user', 'max_steps_per_user', 'utilization_percentage'),
+        "constraint_compliance": ('solutions_found',),
+    }
+    
+    def __init__(self, metadata_handler, output_dir: str = "results/plots", gui_mode: bool = False,
+                 dpi: int = 120, plot_format: str = "png"):
         self.metadata_handler = metadata_handler
         self.output_dir = output_dir
         self.gui_mode = gui_mode
+        self.dpi = dpi  # Screen resolution by default; pass 300 for print-quality plots
+        # "pdf" or "svg" skip rasterization entirely; the GUI displays the default PNGs
+        self.plot_format = plot_format
+        # path -> ((mtime_ns, size), parsed metadata), reused across visualize() calls
+        self._metadata_cache: Dict[str, Tuple[Tuple[int, int], Dict]] = {}
+        # Single figure shared by all plots, cleared between them instead of reallocated
+        self._figure: Optional[plt.Figure] = None
 
         os.makedirs(output_dir, exist_ok=True)
         
+        if not gui_mode:
+            # Batch runs only write files: avoid any GUI backend and its event loop
+            matplotlib.use('Agg', force=True)
+            plt.ioff()
+        
         self._setup_plotting_style()
        
     def _setup_plotting_style(self):
@@ -46,76 +78,152 @@ class Visualizer:
             'figure.titlesize': 16
         })
 
-    def save_plot(self, filename: str):
+    def _get_figure(self, figsize: Tuple[float, float], layout: Optional[str] = None) -> plt.Figure:
+        """Return the shared figure, cleared and resized, creating it on first use"""
+        fig = self._figure
+        if fig is None or not plt.fignum_exists(fig.number):
+            fig = self._figure = plt.figure(figsize=figsize, layout=layout)
+            return fig
+        
+        fig.clear()
+        fig.set_size_inches(figsize)
+        fig.set_layout_engine(layout or 'none')
+        plt.figure(fig.number)  # Make it the current figure for the pyplot calls
+        return fig
+
+    def _output_name(self, filename: str) -> str:
+        """Plot file name with the extension of the configured output format"""
+        return f"{os.path.splitext(filename)[0]}.{self.plot_format}"
+
+    def save_plot(self, fig: plt.Figure, filename: str):
         """Save plot to file with proper error handling"""
+        filename = self._output_name(filename)
         try:
-            plt.savefig(os.path.join(self.output_dir, filename), 
-                       dpi=300, bbox_inches='tight')
+            # Fast zlib level: the PNGs are rewritten every run, size matters less than encode time
+            options = {'pil_kwargs': {'compress_level': 1, 'optimize': False}} if self.plot_format == 'png' else {}
+            # Encode in memory and write the file with a single call; the encoder otherwise
+            # issues many small writes
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=self.plot_format, dpi=self.dpi, bbox_inches='tight', **options)
+            with open(os.path.join(self.output_dir, filename), 'wb') as f:
+                f.write(buffer.getbuffer())
         except Exception as e:
             log(self.gui_mode, f"Error saving plot {filename}: {str(e)}")
         finally:
-            plt.close('all')  # Close all figures
+            if fig is self._figure:
+                fig.clear()
+            else:
+                plt.close(fig)
 
     def load_metadata_files(self, metadata_dir: str) -> Dict[str, List]:
         """Load metadata from existing files"""
-        comparison_data = defaultdict(list)
+        records = []
         
         try:
             # Get all metadata files
-            metadata_files = [f for f in os.listdir(metadata_dir) 
-                            if f.endswith('_metadata.json')]
+            with os.scandir(metadata_dir) as entries:
+                metadata_files = sorted((entry for entry in entries
+                                         if entry.name.endswith('_metadata.json')),
+                                        key=lambda entry: entry.name)
             
             if not metadata_files:
                 log(self.gui_mode, f"No metadata files found in {metadata_dir}")
-                return dict(comparison_data)
+                return {}
             
             log(self.gui_mode, f"Found {len(metadata_files)} metadata files")
             
-            for filename in sorted(metadata_files):
-                try:
-                    with open(os.path.join(metadata_dir, filename)) as f:
-                        metadata = json.load(f)
-                    
-                    # Basic instance info
-                    comparison_data['filenames'].append(metadata['instance']['filename'])
-                    comparison_data['num_steps'].append(metadata['instance']['details']['Total Steps'])
-                    comparison_data['num_users'].append(metadata['instance']['details']['Total Users'])
-                    comparison_data['num_constraints'].append(metadata['instance']['details']['Total Constraints'])
-                    
-                    # Constraint types
-                    constraint_types = metadata['instance']['details'].get('constraint_types', {})
-                    for ctype, count in constraint_types.items():
-                        comparison_data[f'constraint_{ctype}'].append(count)
-                    
-                    # Get active constraints
-                    active = metadata['solver']['active_constraints']
-                    for ctype, is_active in active.items():
-                        comparison_data[f'constraint_{ctype}_active'].append(1 if is_active else 0)
-                    
-                    # Solution status and metrics
-                    comparison_data['solving_times'].append(metadata['metrics']['solving_time_ms'])
-                    comparison_data['solutions_found'].append(metadata['metrics']['solution_found'])
-                    comparison_data['uniqueness'].append(metadata['metrics']['solution_unique'])
-                    comparison_data['violations'].append(metadata['metrics'].get('constraint_violations', 0))
-                    
-                    # Authorization analysis
-                    auth_analysis = metadata['instance']['details'].get('authorization_analysis', {})
-                    comparison_data['authorization_analysis'].append(auth_analysis)
-                    
-                    # Workload distribution
-                    workload = metadata['instance']['details'].get('workload_distribution', {})
-                    for metric in ['avg_steps_per_user', 'max_steps_per_user', 'utilization_percentage']:
-                        comparison_data[metric].append(workload.get(metric, 0))
-                    
-                except Exception as e:
-                    log(self.gui_mode, f"Error processing {filename}: {str(e)}")
+            cache_file = os.path.join(self.output_dir, f".cache_{self._listing_key(metadata_files)}.npz")
+            data = self._load_data_cache(cache_file)
+            if data is not None:
+                return data
+            
+            if len(metadata_files) >= MetadataHandler.PARALLEL_LOAD_THRESHOLD:
+                with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                    parsed = list(executor.map(self._read_metadata_file, metadata_files))
+            else:
+                parsed = [self._read_metadata_file(entry) for entry in metadata_files]
+            
+            for entry, (metadata, error) in zip(metadata_files, parsed):
+                if error is None:
+                    # Skip foreign or old-format files here rather than failing the whole batch
+                    try:
+                        self.metadata_handler.validate_record(metadata)
+                    except (KeyError, TypeError, AttributeError) as e:
+                        error = e
+                if error is not None:
+                    log(self.gui_mode, f"Error processing {entry.name}: {str(error)}")
                     continue
+                records.append(metadata)
             
-            return dict(comparison_data)
+            data = self.metadata_handler.build_comparison_data(records)
+            self._save_data_cache(cache_file, data)
+            return data
             
         except Exception as e:
             log(self.gui_mode, f"Error loading metadata files: {str(e)}")
-            return dict(comparison_data)
+            return {}
+
+    @staticmethod
+    def _listing_key(entries: List[os.DirEntry]) -> str:
+        """Hash of the metadata file names, sizes and mtimes; changes whenever any file does"""
+        listing = []
+        for entry in entries:
+            stat = entry.stat()
+            listing.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return hashlib.blake2b(repr(listing).encode(), digest_size=8).hexdigest()
+
+    def _load_data_cache(self, cache_file: str) -> Optional[Dict]:
+        """Comparison data saved by an earlier run over the same files, or None"""
+        try:
+            with np.load(cache_file) as cached:
+                data = {name: cached[name] for name in cached.files}
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log(self.gui_mode, f"Ignoring unreadable plot data cache: {str(e)}")
+            return None
+        # Non-array columns (lists of dicts, None) travel as JSON, along with the column order
+        extra = load_json(data.pop('__json__').tobytes())
+        data.update(extra['columns'])
+        return {name: data[name] for name in extra['order']}
+
+    def _save_data_cache(self, cache_file: str, data: Dict):
+        """Persist comparison data for the next run, replacing caches of older listings"""
+        arrays = {name: values for name, values in data.items()
+                  if isinstance(values, np.ndarray) and values.dtype != object}
+        extra = {'order': list(data),
+                 'columns': {name: values for name, values in data.items() if name not in arrays}}
+        try:
+            arrays['__json__'] = np.frombuffer(dump_json(extra, pretty=False), dtype=np.uint8)
+            tmp_file = cache_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_file, cache_file)
+            
+            with os.scandir(self.output_dir) as entries:
+                stale = [entry.path for entry in entries
+                         if entry.name.startswith('.cache_') and entry.name.endswith('.npz')
+                         and entry.path != cache_file]
+            for path in stale:
+                os.remove(path)
+        except Exception as e:
+            log(self.gui_mode, f"Could not write plot data cache: {str(e)}")
+
+    def _read_metadata_file(self, entry: os.DirEntry):
+        """Parse one metadata file, returning (metadata, error) so pool workers never raise"""
+        try:
+            stat = entry.stat()
+            key = (stat.st_mtime_ns, stat.st_size)
+            cached = self._metadata_cache.get(entry.path)
+            if cached is not None and cached[0] == key:
+                return cached[1], None
+
+            with open(entry.path, 'rb') as f:
+                metadata = read_json_file(f, stat.st_size)
+            self._metadata_cache[entry.path] = (key, metadata)
+            return metadata, None
+        except Exception as e:
+            return None, e
 
     def visualize(self, data: Optional[Dict[str, List]] = None,
                         metadata_dir: Optional[str] = None,
@@ -127,51 +235,30 @@ class Visualizer:
                 log(self.gui_mode, f"Loading metadata from {metadata_dir}")
                 data = self.load_metadata_files(metadata_dir)
             
-            if not data:
+            # Columns without any instance would only produce empty figures
+            if not data or not len(data.get('filenames', ())):
                 log(self.gui_mode, "No data available for visualization")
                 return
             
-            # Define available plot functions
-            plot_functions = {
-                "solving_times": (self.plot_solving_times, "solving_times.png"),
-                "problem_sizes": (self.plot_problem_sizes, "problem_sizes.png"),
-                "problem_sizes_line": (self.plot_problem_sizes_line, "problem_sizes_line.png"),
-                "constraint_distribution": (self.plot_constraint_distribution, "constraint_distribution.png"),
-                "constraint_activation": (self.plot_constraint_activation, "constraint_activation.png"),
-                "constraint_complexity": (self.plot_constraint_complexity, "constraint_complexity.png"),
-                "solution_statistics": (self.plot_solution_statistics, "solution_stats.png"),
-                "solution_statistics_bar": (self.plot_solution_statistics_bar, "solution_stats_bar.png"),
-                "correlation_matrix": (self.plot_correlation_matrix, "correlations.png"),
-                "efficiency_metrics": (self.plot_efficiency_metrics, "efficiency.png"),
-                "instance_stats": (self.plot_instance_stats, "instance_stats.png"),
-                "step_authorizations": (self.plot_step_authorizations, "step_authorizations.png"),
-                "user_authorizations": (self.plot_user_authorizations, "user_authorizations.png"),
-                "authorization_density": (self.plot_authorization_density, "auth_density.png"),
-                "workload_distribution": (self.plot_workload_distribution, "workload_distribution.png"),
-                "workload_distribution_line": (self.plot_workload_distribution_line, "workload_distribution_line.png"),
-                "constraint_compliance": (self.plot_constraint_compliance, "constraint_compliance.png")
-            }
+            # Instance names and values derived from the columns are shared by every plot;
+            # shallow copy so the caller's dict is left untouched
+            data = dict(data, instances=self._instances(data), derived={})
+            
+            plot_functions = self._plot_functions()
             
             # Determine which plots to generate
-            if specific_plots:
-                plots_to_generate = {
-                    name: func for name, func in plot_functions.items() 
-                    if name in specific_plots
-                }
-            else:
-                plots_to_generate = plot_functions
+            names = [name for name in plot_functions
+                     if not specific_plots or name in specific_plots]
             
-            # Generate selected plots
-            generated_plots = []
-            for name, (plot_func, filename) in plots_to_generate.items():
+            workers = min(len(names), os.cpu_count() or 1)
+            if not self.gui_mode and len(names) >= self.PARALLEL_PLOT_THRESHOLD and workers > 1:
                 try:
-                    log(self.gui_mode, f"Generating {name} plot...")
-                    plot_func(data)
-                    generated_plots.append(filename)
+                    generated_plots = self._render_parallel(data, names, workers)
                 except Exception as e:
-                    log(self.gui_mode, f"Error generating {filename}: {str(e)}")
-                finally:
-                    plt.close('all')
+                    log(self.gui_mode, f"Parallel plotting failed, falling back to serial: {str(e)}")
+                    generated_plots = self._render_plots(data, names)
+            else:
+                generated_plots = self._render_plots(data, names)
             
             return generated_plots
             
@@ -179,11 +266,142 @@ class Visualizer:
             log(self.gui_mode, f"Error during visualization generation: {str(e)}")
             return []
 
+    def _plot_functions(self) -> Dict[str, Tuple]:
+        """Available plots by name, with their output file"""
+        return {
+            "solving_times": (self.plot_solving_times, "solving_times.png"),
+            "problem_sizes": (self.plot_problem_sizes, "problem_sizes.png"),
+            "problem_sizes_line": (self.plot_problem_sizes_line, "problem_sizes_line.png"),
+            "constraint_distribution": (self.plot_constraint_distribution, "constraint_distribution.png"),
+            "constraint_activation": (self.plot_constraint_activation, "constraint_activation.png"),
+            "constraint_complexity": (self.plot_constraint_complexity, "constraint_complexity.png"),
+            "solution_statistics": (self.plot_solution_statistics, "solution_stats.png"),
+            "solution_statistics_bar": (self.plot_solution_statistics_bar, "solution_stats_bar.png"),
+            "correlation_matrix": (self.plot_correlation_matrix, "correlations.png"),
+            "efficiency_metrics": (self.plot_efficiency_metrics, "efficiency.png"),
+            "instance_stats": (self.plot_instance_stats, "instance_stats.png"),
+            "step_authorizations": (self.plot_step_authorizations, "step_authorizations.png"),
+            "user_authorizations": (self.plot_user_authorizations, "user_authorizations.png"),
+            "authorization_density": (self.plot_authorization_density, "auth_density.png"),
+            "workload_distribution": (self.plot_workload_distribution, "workload_distribution.png"),
+            "workload_distribution_line": (self.plot_workload_distribution_line, "workload_distribution_line.png"),
+            "constraint_compliance": (self.plot_constraint_compliance, "constraint_compliance.png")
+        }
+
+    def _render_plots(self, data: Dict[str, List], names: List[str]) -> List[str]:
+        """Draw and save the named plots in order, returning the files written"""
+        plot_functions = self._plot_functions()
+        generated_plots = []
+        for count, name in enumerate(names, 1):
+            plot_func, filename = plot_functions[name]
+            required = self.PLOT_REQUIRES.get(name)
+            if required and not any(self._has_data(data, key) for key in required):
+                log(self.gui_mode, f"Skipping {name} plot: no data")
+                # The GUI loads plots by name, so an earlier run's file must not stand in for this one
+                try:
+                    os.remove(os.path.join(self.output_dir, self._output_name(filename)))
+                except FileNotFoundError:
+                    pass
+                continue
+            
+            open_figures = set(plt.get_fignums())
+            try:
+                log(self.gui_mode, f"Generating {name} plot...")
+                plot_func(data)
+                generated_plots.append(self._output_name(filename))
+            except Exception as e:
+                log(self.gui_mode, f"Error generating {filename}: {str(e)}")
+            finally:
+                # Only close what this plot left behind, never the caller's figures
+                for num in set(plt.get_fignums()) - open_figures:
+                    if self._figure is None or num != self._figure.number:
+                        plt.close(num)
+                # Cleared artists sit in reference cycles; collect them before they pile up
+                if count % self.GC_INTERVAL == 0:
+                    gc.collect()
+        return generated_plots
+
+    def _render_parallel(self, data: Dict[str, List], names: List[str], workers: int) -> List[str]:
+        """Split the named plots across worker processes, returning the files written in order"""
+        # Parse the metadata files here so workers need neither the handler nor the disk
+        self._instance_constraints(data)
+        shares = [(self.output_dir, self.dpi, self.plot_format, data, names[i::workers])
+                  for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            written = {filename for generated in executor.map(_render_share, shares)
+                       for filename in generated}
+        plot_functions = self._plot_functions()
+        filenames = [self._output_name(plot_functions[name][1]) for name in names]
+        return [filename for filename in filenames if filename in written]
+
+    def generate_all_plots(self, data: Dict[str, List]):
+        """Generate every plot for already loaded comparison data"""
+        return self.visualize(data=data)
+
+    @staticmethod
+    def _instances(data: Dict[str, List]) -> List[str]:
+        """Instance names for the x-axis, precomputed by visualize() when available"""
+        instances = data.get('instances')
+        if instances is None:
+            instances = [os.path.splitext(os.path.basename(f))[0] for f in data['filenames']]
+        return instances
+
+    def _has_data(self, data: Dict[str, List], key: str) -> bool:
+        """Whether a column has anything to draw: a non-empty dict, a non-zero number or True"""
+        if key not in data:
+            return False
+        if key in MetadataHandler.NUMERIC_COLUMNS:
+            return bool(self._numeric(data, key).any())
+        return any(data[key])
+
+    @staticmethod
+    def _numeric(data: Dict[str, List], key: str) -> np.ndarray:
+        """Column as float64 with missing values as 0, cleaned once per visualize() run"""
+        cache = data.get('derived', {})
+        if key not in cache:
+            values = data[key]
+            if isinstance(values, np.ndarray) and values.dtype != object:
+                cache[key] = values.astype(np.float64)
+            else:
+                cache[key] = np.fromiter((0.0 if v is None or v == "N/A" else float(v) for v in values),
+                                         dtype=np.float64, count=len(values))
+        return cache[key]
+
+    @staticmethod
+    def _size_ratios(data: Dict[str, List]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Constraints per step, per user and per (step, user) pair, computed once per visualize() run"""
+        cache = data.get('derived', {})
+        if 'size_ratios' not in cache:
+            steps = np.asarray(data['num_steps'])
+            users = np.asarray(data['num_users'])
+            constraints = np.asarray(data['num_constraints'])
+            cache['size_ratios'] = (constraints / steps, constraints / users,
+                                    constraints / (steps * users))
+        return cache['size_ratios']
+
+    def _instance_constraints(self, data: Dict[str, List]) -> List[Optional[Tuple[Dict, Dict]]]:
+        """Per-instance (constraint type counts, active flags), None if unloadable; read once per run"""
+        cache = data.get('derived', {})
+        if 'instance_constraints' not in cache:
+            constraints = []
+            for instance in self._instances(data):
+                try:
+                    metadata = self.metadata_handler.load(f"{instance}_metadata.json")
+                    if not metadata or 'instance' not in metadata:
+                        constraints.append(None)
+                        continue
+                    constraints.append((metadata['instance']['details'].get('constraint_types', {}),
+                                        self.metadata_handler.active_constraints(metadata)))
+                except Exception:
+                    constraints.append(None)
+            cache['instance_constraints'] = constraints
+        return cache['instance_constraints']
+
     def plot_solving_times(self, data: Dict[str, List], output_file: str = "solving_times.png"):
-        plt.figure(figsize=(10, 6))
+        fig = self._get_figure((10, 6))
         
-        instances = [Path(f).stem for f in data['filenames']]
-        times = np.array(data['solving_times']) / 1000  # Convert to seconds
+        instances = self._instances(data)
+        times = np.asarray(data['solving_times']) / 1000  # Convert to seconds
         
         bars = plt.bar(instances, times)
         plt.xticks(rotation=45, ha='right')
@@ -191,45 +409,24 @@ class Visualizer:
         plt.title(f'WSP Instance Solving Times (Gray = UNSAT)')
         plt.ylim(0, max(times) * 1.2)  # Set y-limit to 120% of max time
         
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
         
     def plot_step_authorizations(self, data: Dict[str, List], output_file: str = "step_authorizations.png"):
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         if 'authorization_analysis' in data and data['authorization_analysis']:
             auth_data = data['authorization_analysis']
-            plt.figure(figsize=(12, 6))
             
-            # Find max step number across all instances
-            max_step = 0
-            for instance_auth in auth_data:
-                if 'per_step' in instance_auth:
-                    steps = [int(s[1:]) for s in instance_auth['per_step'].keys()]
-                    if steps:
-                        max_step = max(max_step, max(steps))
+            values = self._authorization_counts(auth_data, 'per_step')
+            max_step = values.shape[1]
             
             if max_step > 0:
                 x = np.arange(1, max_step + 1)  # Step numbers
-                width = 0.8 / len(instances)
-                
-                for i, (instance, auth) in enumerate(zip(instances, auth_data)):
-                    values = []
-                    for step in range(1, max_step + 1):
-                        step_key = f's{step}'
-                        if 'per_step' in auth and step_key in auth['per_step']:
-                            values.append(len(auth['per_step'][step_key]))
-                        else:
-                            values.append(0)
-                            
-                    plt.bar(x + i*width - width*len(instances)/2, 
-                        values, width, label=instance)
                 
-                plt.legend()
-                plt.xlabel('Steps')
-                plt.ylabel('Number of Authorized Users')
+                self._plot_authorization_grid(x, values, instances,
+                                              'Steps', 'Number of Authorized Users')
                 plt.title(f'Step Authorization Distribution')
-                plt.xticks(x)
             else:
                 plt.text(0.5, 0.5, 'No step authorization data found',
                         ha='center', va='center')
@@ -237,45 +434,24 @@ class Visualizer:
             plt.text(0.5, 0.5, 'No authorization analysis data available',
                     ha='center', va='center')
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
         
     def plot_user_authorizations(self, data: Dict[str, List], output_file: str = "user_authorizations.png"):
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         if 'authorization_analysis' in data and data['authorization_analysis']:
             auth_data = data['authorization_analysis']
             
-            # Find max user number across all instances
-            max_user = 0
-            for instance_auth in auth_data:
-                if 'per_user' in instance_auth:
-                    users = [int(u[1:]) for u in instance_auth['per_user'].keys()]
-                    if users:
-                        max_user = max(max_user, max(users))
+            values = self._authorization_counts(auth_data, 'per_user')
+            max_user = values.shape[1]
             
             if max_user > 0:
                 x = np.arange(1, max_user + 1)  # User numbers
-                width = 0.8 / len(instances)
                 
-                for i, (instance, auth) in enumerate(zip(instances, auth_data)):
-                    values = []
-                    for user in range(1, max_user + 1):
-                        user_key = f'u{user}'
-                        if 'per_user' in auth and user_key in auth['per_user']:
-                            values.append(len(auth['per_user'][user_key]))
-                        else:
-                            values.append(0)
-                            
-                    plt.bar(x + i*width - width*len(instances)/2, 
-                        values, width, label=instance)
-                
-                plt.legend()
-                plt.xlabel('Users')
-                plt.ylabel('Number of Authorized Steps')
+                self._plot_authorization_grid(x, values, instances,
+                                              'Users', 'Number of Authorized Steps')
                 plt.title(f'User Authorization Distribution')
-                plt.xticks(x)
             else:
                 plt.text(0.5, 0.5, 'No user authorization data found',
                         ha='center', va='center')
@@ -283,33 +459,74 @@ class Visualizer:
             plt.text(0.5, 0.5, 'No authorization analysis data available',
                     ha='center', va='center')
         
-        plt.tight_layout()
-        self.save_plot(output_file)
-        
+        self.save_plot(fig, output_file)
+        
+    def _authorization_counts(self, auth_data: List[Dict], field: str) -> np.ndarray:
+        """Count matrix (instance x step/user number) built from the keys actually present"""
+        rows = [auth.get(field, {}) for auth in auth_data]
+        numbers = [np.fromiter((int(key[1:]) for key in row), dtype=np.intp, count=len(row))
+                   for row in rows]
+        width = max((int(nums.max()) for nums in numbers if nums.size), default=0)
+        
+        values = np.zeros((len(rows), max(width, 0)), dtype=np.int64)
+        for j, (row, nums) in enumerate(zip(rows, numbers)):
+            counts = np.fromiter((len(members) for members in row.values()), dtype=np.int64, count=len(row))
+            keep = nums > 0
+            values[j, nums[keep] - 1] = counts[keep]  # One scatter per instance
+        return values
+
+    def _plot_authorization_grid(self, x: np.ndarray, values: np.ndarray, labels: List[str],
+                                 xlabel: str, value_label: str):
+        """Grouped bars per instance, or a single heatmap once there are too many bars to read"""
+        if values.size > self.AUTH_HEATMAP_THRESHOLD:
+            # One QuadMesh instead of a Rectangle per cell; cells centred on the step/user numbers
+            mesh = plt.pcolormesh(np.arange(len(x) + 1) + x[0] - 0.5, np.arange(len(labels) + 1),
+                                  values, cmap='viridis')
+            plt.colorbar(mesh, label=value_label)
+            plt.yticks(np.arange(len(labels)) + 0.5, labels)
+        else:
+            self._plot_grouped_bars(x, values, labels)
+            plt.ylabel(value_label)
+            plt.xticks(x)
+        plt.xlabel(xlabel)
+
+    def _plot_grouped_bars(self, x: np.ndarray, values: np.ndarray, labels: List[str]):
+        """Draw one bar group per row of values with a single bar call and a manual legend"""
+        n_groups = len(labels)
+        width = 0.8 / n_groups
+        offsets = np.arange(n_groups) * width - width * n_groups / 2
+        colors = [self.colors[i % len(self.colors)] for i in range(n_groups)]
+        
+        plt.bar((offsets[:, None] + x[None, :]).ravel(), values.ravel(), width,
+                color=[color for color in colors for _ in x])
+        plt.legend([plt.Rectangle((0, 0), 1, 1, facecolor=color) for color in colors], labels)
+
     def plot_problem_sizes(self, data: Dict[str, List],
-                          output_file: str = "problem_sizes.png"):
-        """Plot problem size metrics"""
-        plt.figure(figsize=(12, 6))
+                          output_file: str = "problem_sizes.png", symlog: bool = False):
+        """Plot problem size metrics, optionally on a symlog axis when constraints dwarf the rest"""
+        fig = self._get_figure((12, 6))
         
-        instances = [Path(f).stem for f in data['filenames']]
+        instances = self._instances(data)
         x = np.arange(len(instances))
         width = 0.25
         
-        plt.bar(x - width, data['num_steps'], width, label='Steps')
-        plt.bar(x, data['num_users'], width, label='Users')
-        plt.bar(x + width, data['num_constraints'], width, label='Constraints')
+        heights = np.stack([np.asarray(data[key]) for key in ('num_steps', 'num_users', 'num_constraints')])
+        for offset, row, label in zip((-width, 0, width), heights, ('Steps', 'Users', 'Constraints')):
+            plt.bar(x + offset, row, width, label=label)
         
         plt.xticks(x, instances, rotation=45, ha='right')
         plt.ylabel('Count')
+        if symlog:
+            plt.yscale('symlog')
         plt.title('WSP Instance Size Comparison')
         plt.legend()
         
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_problem_sizes_line(self, data: Dict[str, List], output_file: str = "problem_sizes_line.png"):
         """Plot problem size metrics as line plot"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         x = np.arange(len(instances))
         
         plt.plot(x, data['num_steps'], 'o-', label='Steps', linewidth=2)
@@ -322,12 +539,11 @@ class Visualizer:
         plt.grid(True, alpha=0.3)
         plt.legend()
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
         
     def plot_workload_distribution(self, data: Dict[str, List], output_file: str = "workload_distribution.png"):
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         metrics = ['avg_steps_per_user', 'max_steps_per_user', 'utilization_percentage']
         if any(metric in data for metric in metrics):
@@ -349,13 +565,12 @@ class Visualizer:
             plt.text(0.5, 0.5, 'No workload distribution data available',
                     ha='center', va='center')
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_workload_distribution_line(self, data: Dict[str, List], output_file: str = "workload_distribution_line.png"):
         """Plot workload distribution metrics as line plot"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         x = np.arange(len(instances))
         
         metrics = ['avg_steps_per_user', 'max_steps_per_user', 'utilization_percentage']
@@ -371,13 +586,12 @@ class Visualizer:
         plt.grid(True, alpha=0.3)
         plt.legend()
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_constraint_compliance(self, data: Dict[str, List], output_file: str = "constraint_compliance.png"):
         """Plot constraint compliance with detailed violation breakdown"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         if 'solutions_found' in data and any(data['solutions_found']):
             sat_instances = [i for i, sat in enumerate(data['solutions_found']) if sat]
@@ -406,13 +620,12 @@ class Visualizer:
             plt.text(0.5, 0.5, 'No constraint compliance data available',
                     ha='center', va='center')
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_constraint_distribution(self, data: Dict[str, List], output_file: str = "constraint_distribution.png"):
         """Plot constraint distribution across instances"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         # Get all constraint types
         constraint_types = ['authorizations', 'separation_of_duty', 'binding_of_duty', 
@@ -422,45 +635,36 @@ class Visualizer:
         x = np.arange(len(instances))
         width = 0.8 / len(constraint_types)
         
-        # Create legend handles and labels manually
-        legend_handles = []
-        legend_labels = []
+        # Bar offset of every constraint type within an instance's group
+        positions = x[:, None] + (np.arange(len(constraint_types)) * width
+                                  - width * len(constraint_types) / 2)[None, :]
+        color_table = np.array([self.colors[i % len(self.colors)] for i in range(len(constraint_types))])
+        
+        plotted_types = [(i, ctype) for i, ctype in enumerate(constraint_types)
+                         if f'constraint_{ctype}' in data]
+        present = np.zeros(positions.shape, dtype=bool)
+        active = np.zeros(positions.shape, dtype=bool)
         
-        has_data = False
-        for i, ctype in enumerate(constraint_types):
-            key = f'constraint_{ctype}'
-            label_added = False
+        for j, constraints in enumerate(self._instance_constraints(data)):
+            if constraints is None:
+                continue
+            constraint_types_data, active_constraints = constraints
             
-            if key in data:
-                for j, instance in enumerate(instances):
-                    try:
-                        metadata = self.metadata_handler.load(f"{instance}_metadata.json")
-                        
-                        if metadata is None:
-                            continue
-                            
-                        if 'instance' not in metadata:
-                            continue
-                            
-                        constraint_types_data = metadata['instance']['details'].get('constraint_types', {})
-                        
-                        has_constraint = constraint_types_data.get(ctype, 0) > 0
-                        
-                        if has_constraint:
-                            has_data = True
-                            is_active = metadata['solver']['active_constraints'].get(ctype, False)
-                            
-                            color = self.colors[i % len(self.colors)] if is_active else self.na_color
-                            bar_position = x[j] + i*width - width*len(constraint_types)/2
-                            
-                            plt.bar(bar_position, 1, width, color=color)
-                            
-                            if not label_added:
-                                legend_handles.append(plt.Rectangle((0,0),1,1, facecolor=self.colors[i % len(self.colors)]))
-                                legend_labels.append(ctype.replace('_', ' ').title())
-                                label_added = True
-                    except Exception as e:
-                        continue
+            for i, ctype in plotted_types:
+                if constraint_types_data.get(ctype, 0) > 0:
+                    present[j, i] = True
+                    active[j, i] = active_constraints.get(ctype, False)
+        
+        has_data = present.any()
+        if has_data:
+            colors = np.where(active, color_table[None, :], self.na_color)
+            plt.bar(positions[present], 1, width, color=colors[present])
+        
+        # Create legend handles and labels manually
+        labelled = present.any(axis=0)
+        legend_handles = [plt.Rectangle((0,0),1,1, facecolor=color_table[i])
+                          for i, _ in plotted_types if labelled[i]]
+        legend_labels = [ctype.replace('_', ' ').title() for i, ctype in plotted_types if labelled[i]]
         
         if not has_data:
             plt.text(0.5, 0.5, 'No constraint data available',
@@ -476,39 +680,31 @@ class Visualizer:
                 plt.legend(legend_handles, legend_labels, 
                         bbox_to_anchor=(1.05, 1), loc='upper left')
             
-        plt.tight_layout()
         
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_constraint_activation(self, data: Dict[str, List], output_file: str = "constraint_activation.png"):
         """Plot activated and inactivated constraints across instances"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
-        
-        # Track constraints across all instances
-        type_stats = defaultdict(lambda: {'present': 0, 'active': 0})
-        
-        for instance in instances:
-            metadata = self.metadata_handler.load(f"{instance}_metadata.json")
-            if metadata and 'instance' in metadata:
-                constraint_types = metadata['instance']['details'].get('constraint_types', {})
-                active_constraints = metadata['solver']['active_constraints']
-                
-                for ctype, count in constraint_types.items():
-                    if count > 0:
-                        type_stats[ctype]['present'] += 1
-                        if active_constraints.get(ctype, False):
-                            type_stats[ctype]['active'] += 1
-        
-        if not type_stats:
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
+        
+        # Track constraints across all instances as instance x type matrices
+        rows = [constraints for constraints in self._instance_constraints(data) if constraints is not None]
+        constraint_types = sorted({ctype for counts, _ in rows
+                                   for ctype, count in counts.items() if count > 0})
+        present_mat = np.array([[counts.get(ct, 0) > 0 for ct in constraint_types]
+                                for counts, _ in rows], dtype=bool).reshape(len(rows), len(constraint_types))
+        active_mat = np.array([[bool(flags.get(ct, False)) for ct in constraint_types]
+                               for _, flags in rows], dtype=bool).reshape(present_mat.shape)
+        
+        if not constraint_types:
             plt.text(0.5, 0.5, 'No constraint data available',
                     ha='center', va='center')
         else:
-            constraint_types = sorted(type_stats.keys())
             y_pos = np.arange(len(constraint_types))
             
-            inactive = [type_stats[ct]['present'] - type_stats[ct]['active'] for ct in constraint_types]
-            active = [type_stats[ct]['active'] for ct in constraint_types]
+            active = (present_mat & active_mat).sum(axis=0)
+            inactive = present_mat.sum(axis=0) - active
             
             plt.barh(y_pos, inactive, color=self.na_color, label='Available but Inactive')
             plt.barh(y_pos, active, left=inactive, color=self.colors[0], label='Active')
@@ -523,28 +719,27 @@ class Visualizer:
                     
             plt.legend()
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_solution_statistics(self, data: Dict[str, List], output_file: str = "solution_stats.png"):
         """Plot solution statistics using line graph"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        instances = self._instances(data)
         x = np.arange(len(instances))
 
         # Create figure with two y-axes
-        fig, ax1 = plt.subplots(figsize=(12, 6))
+        fig = self._get_figure((12, 6), layout='constrained')
+        ax1 = fig.subplots()
         ax2 = ax1.twinx()
         
         # Plot solution status and uniqueness on primary y-axis
         l1 = ax1.plot(x, data['solutions_found'], 'o-', color='#2ecc71', 
                     label='SAT (1) / UNSAT (0)', linewidth=2)
-        uniqueness_values = [float(u if u is not None else 0) for u in data['uniqueness']]
+        uniqueness_values = self._numeric(data, 'uniqueness')
         l2 = ax1.plot(x, uniqueness_values, 's--', color='#3498db', 
                     label='Unique (1) / Multiple (0)', linewidth=2)
         
         # Plot solving time on secondary y-axis
-        times = np.array(data['solving_times']) / 1000  # Convert to seconds
+        times = np.asarray(data['solving_times']) / 1000  # Convert to seconds
         l3 = ax2.plot(x, times, '^-.', color='#e74c3c', 
                     label='Solving Time (s)', linewidth=2)
         
@@ -566,16 +761,12 @@ class Visualizer:
         labs = [l.get_label() for l in lns]
         ax1.legend(lns, labs, loc='center left', bbox_to_anchor=(1.15, 0.5))
         
-        # Adjust layout to ensure everything is visible
-        fig.tight_layout()
-        plt.savefig(os.path.join(self.output_dir, output_file), 
-                    dpi=300, bbox_inches='tight')
-        plt.close()
+        self.save_plot(fig, output_file)
 
     def plot_solution_statistics_bar(self, data: Dict[str, List], output_file: str = "solution_stats_bar.png"):
         """Plot solution statistics using bar chart"""
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         x = np.arange(len(instances))
         width = 0.25  # Width of bars
         
@@ -583,12 +774,12 @@ class Visualizer:
         plt.bar(x - width, data['solutions_found'], width,
                 color='#2ecc71', label='SAT (1) / UNSAT (0)')
         
-        uniqueness_values = [float(u if u is not None else 0) for u in data['uniqueness']]
+        uniqueness_values = self._numeric(data, 'uniqueness')
         plt.bar(x, uniqueness_values, width,
                 color='#3498db', label='Unique (1) / Multiple (0)')
         
         # Normalize solving times to [0,1] for comparison
-        times = np.array(data['solving_times']) / 1000  # Convert to seconds
+        times = np.asarray(data['solving_times']) / 1000  # Convert to seconds
         if max(times) > 0:  # Avoid division by zero
             normalized_times = times / max(times)
         else:
@@ -607,8 +798,7 @@ class Visualizer:
         plt.xticks(x, instances, rotation=45, ha='right')
         plt.legend()
         plt.grid(True, alpha=0.3)
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_correlation_matrix(self, data: Dict[str, List], output_file: str = "correlations.png"):
         """Plot correlation matrix with robust error handling"""
@@ -618,76 +808,80 @@ class Visualizer:
                             'num_constraints', 'violations']
             numerical_data = {}
             
-            # Clean and prepare data
             for k in numerical_keys:
                 if k in data:
-                    values = []
-                    for v in data[k]:
-                        if v is None or v == "N/A":
-                            values.append(0)  # Use 0 for NA values
-                        else:
-                            values.append(float(v))
-                    numerical_data[k] = values
+                    numerical_data[k] = self._numeric(data, k)
             
             if not numerical_data:
                 return
                 
-            # Calculate correlation matrix with error handling
-            matrix = np.zeros((len(numerical_data), len(numerical_data)))
+            # Pairwise Pearson correlation over the rows where both metrics are non-zero,
+            # computed for all pairs at once from masked sums
             labels = list(numerical_data.keys())
-            
-            for i, key1 in enumerate(labels):
-                for j, key2 in enumerate(labels):
-                    try:
-                        if i == j:
-                            matrix[i, j] = 1.0
-                        else:
-                            valid_indices = [idx for idx, (v1, v2) in 
-                                           enumerate(zip(numerical_data[key1], numerical_data[key2]))
-                                           if v1 != 0 and v2 != 0]  # Only use non-zero values
-                            
-                            if valid_indices:
-                                x = [numerical_data[key1][i] for i in valid_indices]
-                                y = [numerical_data[key2][i] for i in valid_indices]
-                                matrix[i, j] = np.corrcoef(x, y)[0, 1]
-                            else:
-                                matrix[i, j] = np.nan
-                    except:
-                        matrix[i, j] = np.nan
-            
-            plt.figure(figsize=(10, 8))
-            mask = np.isnan(matrix)  # Mask NaN values
-            
-            sns.heatmap(matrix, annot=True, cmap='coolwarm', center=0,
-                       xticklabels=labels, yticklabels=labels,
-                       mask=mask, cbar_kws={'label': 'Correlation'})
+            values = np.array([numerical_data[k] for k in labels], dtype=float)
+            valid = (values != 0).astype(float)
+            # Centre each metric first (correlation is shift-invariant) to avoid cancellation
+            centre = values.sum(axis=1, keepdims=True) / np.maximum(valid.sum(axis=1, keepdims=True), 1)
+            values = (values - centre) * valid
+            
+            count = valid @ valid.T
+            sum_x = values @ valid.T
+            sum_y = sum_x.T
+            sum_xx = (values ** 2) @ valid.T
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cov = values @ values.T - sum_x * sum_y / count
+                var_x = sum_xx - sum_x ** 2 / count
+                var_y = sum_xx.T - sum_y ** 2 / count
+                # A metric constant over the pair's rows leaves only rounding noise: no correlation
+                var_x[var_x <= 1e-12 * sum_xx] = np.nan
+                var_y[var_y <= 1e-12 * sum_xx.T] = np.nan
+                matrix = np.clip(cov / np.sqrt(var_x * var_y), -1, 1)
+            matrix[count < 2] = np.nan
+            np.fill_diagonal(matrix, 1.0)
+            
+            fig = self._get_figure((10, 8))
+            ax = fig.gca()
+            
+            # A single image; NaN cells are left blank
+            image = ax.imshow(matrix, cmap='coolwarm', vmin=-1, vmax=1)
+            fig.colorbar(image, ax=ax, label='Correlation')
+            ax.set_xticks(np.arange(len(labels)), labels, rotation=45, ha='right')
+            ax.set_yticks(np.arange(len(labels)), labels)
+            ax.grid(False)
+            
+            if len(labels) <= self.CORRELATION_ANNOTATE_LIMIT:
+                for i, j in zip(*np.nonzero(~np.isnan(matrix))):
+                    value = matrix[i, j]
+                    ax.text(j, i, f'{value:.2g}', ha='center', va='center',
+                            color='white' if abs(value) > 0.6 else 'black')
             
             plt.title('Correlation Matrix of WSP Metrics')
             
         except Exception as e:
             log(self.gui_mode, f"Error generating correlation matrix: {str(e)}")
             # Create empty plot with message
-            plt.figure(figsize=(10, 8))
+            fig = self._get_figure((10, 8))
             plt.text(0.5, 0.5, 'Correlation matrix unavailable\nInsufficient data',
                     ha='center', va='center')
             
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
         
     def plot_efficiency_metrics(self, data: Dict[str, List],
                           output_file: str = "efficiency.png"):
         """Plot efficiency metrics"""
-        plt.figure(figsize=(10, 6))
+        fig = self._get_figure((10, 6))
         
-        instances = [Path(f).stem for f in data['filenames']]
-        times = np.array(data['solving_times']) / 1000  # Convert to seconds
+        instances = self._instances(data)
+        times = np.asarray(data['solving_times']) / 1000  # Convert to seconds
         
-        # Add small epsilon to avoid division by zero
-        times = np.where(times == 0, np.finfo(float).eps, times)
+        # Floor at a small epsilon to avoid division by zero
+        np.clip(times, np.finfo(float).eps, None, out=times)
         
-        # Calculate efficiency metrics
-        steps_per_time = np.array(data['num_steps']) / times
-        users_per_time = np.array(data['num_users']) / times
-        constraints_per_time = np.array(data['num_constraints']) / times
+        # Calculate efficiency metrics, sharing one reciprocal of the times
+        inv_times = np.reciprocal(times)
+        steps_per_time = np.asarray(data['num_steps']) * inv_times
+        users_per_time = np.asarray(data['num_users']) * inv_times
+        constraints_per_time = np.asarray(data['num_constraints']) * inv_times
         
         # Plot
         plt.plot(instances, steps_per_time, 'o-', label='Steps/second')
@@ -700,20 +894,16 @@ class Visualizer:
         plt.legend()
         plt.yscale('log')  # Use log scale for better visualization
         
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
            
     def plot_authorization_density(self, data: Dict[str, List], output_file: str = "auth_density.png"):
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         if 'num_steps' in data and 'num_users' in data and 'num_constraints' in data:
             x = np.arange(len(instances))
             # Calculate density as constraints/(steps*users)
-            density = [c/(s*u)*100 for c, s, u in zip(
-                data['num_constraints'],
-                data['num_steps'],
-                data['num_users']
-            )]
+            density = self._size_ratios(data)[2] * 100
             
             plt.plot(x, density, 'o-', linewidth=2, label='Density')
             mean_density = np.mean(density)
@@ -729,13 +919,12 @@ class Visualizer:
             plt.text(0.5, 0.5, 'Insufficient data for authorization density',
                     ha='center', va='center')
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     # Add method to show constraint complexity metrics
     def plot_constraint_complexity(self, data: Dict[str, List], output_file: str = "constraint_complexity.png"):
-        plt.figure(figsize=(12, 6))
-        instances = [Path(f).stem for f in data['filenames']]
+        fig = self._get_figure((12, 6), layout='constrained')
+        instances = self._instances(data)
         
         # Calculate complexity metrics
         if all(key in data for key in ['num_steps', 'num_users', 'num_constraints']):
@@ -743,9 +932,7 @@ class Visualizer:
             width = 0.3
             
             # Calculate metrics
-            step_constraint_ratio = np.array(data['num_constraints']) / np.array(data['num_steps'])
-            user_constraint_ratio = np.array(data['num_constraints']) / np.array(data['num_users'])
-            density = np.array(data['num_constraints']) / (np.array(data['num_steps']) * np.array(data['num_users']))
+            step_constraint_ratio, user_constraint_ratio, density = self._size_ratios(data)
             
             # Plot
             plt.bar(x - width, step_constraint_ratio, width, label='Constraints/Step')
@@ -760,20 +947,19 @@ class Visualizer:
             plt.text(0.5, 0.5, 'Insufficient data for complexity metrics',
                     ha='center', va='center')
         
-        plt.tight_layout()
-        self.save_plot(output_file)
+        self.save_plot(fig, output_file)
 
     def plot_instance_stats(self, data: Dict[str, List], output_file: str = "instance_stats.png"):
         """Plot comprehensive instance statistics including UNSAT cases"""
         try:
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-            instances = [Path(f).stem for f in data['filenames']]
+            fig = self._get_figure((12, 10), layout='constrained')
+            ax1, ax2 = fig.subplots(2, 1)
+            instances = self._instances(data)
             x = np.arange(len(instances))
             
             # Plot 1: Solution Status
-            status_colors = ['#2ecc71' if sat else '#e74c3c' 
-                            for sat in data['solutions_found']]
-            ax1.bar(x, [1] * len(instances), color=status_colors)
+            status_colors = np.where(np.asarray(data['solutions_found'], dtype=bool), '#2ecc71', '#e74c3c')
+            ax1.bar(x, np.ones(len(instances)), color=status_colors)
             ax1.set_title('Solution Status (Green=SAT, Red=UNSAT)')
             ax1.set_xticks(x)
             ax1.set_xticklabels(instances, rotation=45, ha='right')
@@ -783,12 +969,7 @@ class Visualizer:
             width = 0.25
             
             for i, metric in enumerate(metrics):
-                values = []
-                for val in data[metric]:
-                    if val is None or val == "N/A":
-                        values.append(0)
-                    else:
-                        values.append(float(val))
+                values = self._numeric(data, metric)
                 ax2.bar(x + i*width, values, width, label=metric.replace('num_', ''))
             
             ax2.set_title('Instance Metrics')
@@ -796,9 +977,13 @@ class Visualizer:
             ax2.set_xticklabels(instances, rotation=45, ha='right')
             ax2.legend()
             
-            plt.tight_layout()
-            self.save_plot(output_file)
+            self.save_plot(fig, output_file)
         except Exception as e:
             log(self.gui_mode, f"Error in instance_stats plot: {str(e)}")
-        finally:
-            plt.close('all')
+
+
+def _render_share(args) -> List[str]:
+    """Worker process entry point: render a share of the plots with a handler-less Visualizer"""
+    output_dir, dpi, plot_format, data, names = args
+    visualizer = Visualizer(None, output_dir=output_dir, dpi=dpi, plot_format=plot_format)
+    return visualizer._render_plots(data, names)